@@ -1,5 +1,7 @@
 from dataclasses import dataclass, asdict
+from itertools import compress
 from typing import Any, List, Optional
+import numpy as np
 import pandas as pd
 
 from db_connection import get_postgresdb_from_neon_keys, PostgresDB
@@ -36,20 +38,13 @@ class ActivityDetails:
         id_ = record.get("id") or record.get("webhook_id")
         type_ = record.get("type")
         created_at = record.get("created_at") or record.get("created")
-        # `data` may be stored as json/jsonb or as text
+        # `data` is stored as json/jsonb
         data = record.get("data")
         # Also accept older name `payload` if present
         if data is None:
             data = record.get("payload")
-        # Ensure data is a dict if it's JSON string
-        if isinstance(data, str):
-            try:
-                import json
-
-                data = json.loads(data)
-            except Exception:
-                # leave as-is if not parseable
-                pass
+        # json/jsonb columns are already decoded to dicts by the psycopg2
+        # adapter registered in `db_connection`, so no re-parse is needed here.
 
         return cls(id=id_, type=type_, created_at=created_at, data=data, raw=record)
 
@@ -66,8 +61,9 @@ class ActivityDetails:
         detail = self.data
         # if the activity detail is wrapped inside an 'activityDetails' list,
         # take the first element
-        if isinstance(detail.get("activityDetails"), list) and len(detail.get("activityDetails")) > 0:
-            detail = detail.get("activityDetails")[0]
+        inner = detail.get("activityDetails")
+        if isinstance(inner, list) and inner:
+            detail = inner[0]
         return extract_samples_from_detail(detail)
 
 
@@ -112,12 +108,12 @@ def fetch_activity_details(
     q += " ORDER BY created_at DESC LIMIT %s"
     params.append(limit)
 
+    # rows are streamed from a server-side cursor straight into ActivityDetails
     with db:
-        df = db.to_dataframe(q, params=tuple(params))
+        results: List[ActivityDetails] = [ActivityDetails.from_record(r) for r in db.iter_records(q, params=tuple(params))]
 
-    # convert DataFrame rows to ActivityDetails
-    # If filtered df is empty and we have a target_user_id, attempt fallback
-    if df.empty and target_user_id:
+    # If filtered fetch is empty and we have a target_user_id, attempt fallback
+    if not results and target_user_id:
         try:
             print(f"No rows for target_user_id={target_user_id!r}; falling back to unfiltered fetch")
         except Exception:
@@ -130,22 +126,67 @@ def fetch_activity_details(
         q2 += " ORDER BY created_at DESC LIMIT %s"
         params2.append(limit)
         with db:
-            df = db.to_dataframe(q2, params=tuple(params2))
-
-    results: List[ActivityDetails] = []
-    for _, row in df.iterrows():
-        record = {col: row[col] for col in df.columns}
-        results.append(ActivityDetails.from_record(record))
+            results = [ActivityDetails.from_record(r) for r in db.iter_records(q2, params=tuple(params2))]
 
     if created_local:
         db.close()
     return results
 
 
+# Columns for the activity list view (just what the selectbox needs; `type` is
+# implied by the WHERE clause). Only the activity name is projected out of
+# the `data` JSON so the (multi-MB) payload never leaves Postgres for listing;
+# use `fetch_activity_detail_by_id` to load the full payload of one row.
+_LIST_COLUMNS = (
+    "id, created_at, "
+    "COALESCE(data->'activityDetails'->0->>'activityName', data->>'activityName', data->>'name') AS activity_name"
+)
+_LIST_TEXT_COLUMNS = ("activity_name",)
+
+
+# Partial expression indexes backing the activity list queries: the target-user
+# filters (one per accepted JSON key) and the `created_at DESC` ordering are
+# served from an index instead of extracting JSON from every webhook row.
+ACTIVITY_INDEXES_DDL = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS webhooks_activity_created_idx "
+    "ON webhooks (created_at DESC) WHERE type = 'activity-details'",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS webhooks_activity_target_user_idx "
+    "ON webhooks ((data->>'targetUserId'), created_at DESC) WHERE type = 'activity-details'",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS webhooks_activity_target_user_snake_idx "
+    "ON webhooks ((data->>'target_user_id'), created_at DESC) WHERE type = 'activity-details'",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS webhooks_activity_user_idx "
+    "ON webhooks ((data->>'userId'), created_at DESC) WHERE type = 'activity-details'",
+)
+
+
+def create_activity_indexes(db: Optional[PostgresDB] = None, path: str = "neondb_keys.json") -> None:
+    """Create (if missing) the indexes in `ACTIVITY_INDEXES_DDL`.
+
+    One-off maintenance helper; requires privileges to create indexes on `webhooks`.
+    Indexes are built CONCURRENTLY so webhook INSERTs are not blocked meanwhile.
+    """
+    created_local = False
+    if db is None:
+        db = get_postgresdb_from_neon_keys(path)
+        created_local = True
+
+    with db:
+        for ddl in ACTIVITY_INDEXES_DDL:
+            # CONCURRENTLY cannot run inside a transaction block: each statement
+            # runs on its own in autocommit mode
+            db.execute(ddl, autocommit=True)
+
+    if created_local:
+        db.close()
+
+
 def fetch_activity_details_df(
     db: Optional[PostgresDB] = None, path: str = "neondb_keys.json", limit: int = 100, since: Optional[str] = None, target_user_id: Optional[str] = None
 ) -> pd.DataFrame:
-    """Return a pandas DataFrame with the queried activity-details rows."""
+    """Return a pandas DataFrame with the queried activity-details rows.
+
+    The frame holds `id, created_at, activity_name` only (no `data`).
+    """
     created_local = False
     if db is None:
         db = get_postgresdb_from_neon_keys(path)
@@ -155,7 +196,7 @@ def fetch_activity_details_df(
     if target_user_id is None:
         target_user_id = os.getenv('TARGET_USER_ID') or os.getenv('target_user_id') or os.getenv('targetUserId')
 
-    q = "SELECT id, type, data, created_at FROM webhooks WHERE type = 'activity-details'"
+    q = f"SELECT {_LIST_COLUMNS} FROM webhooks WHERE type = 'activity-details'"
     params = []
     if since:
         q += " AND created_at >= %s"
@@ -167,7 +208,7 @@ def fetch_activity_details_df(
     params.append(limit)
 
     with db:
-        df = db.to_dataframe(q, params=tuple(params))
+        df = db.copy_to_dataframe(q, params=tuple(params), autocommit=True, text_columns=_LIST_TEXT_COLUMNS)
 
     # If we applied a target_user_id filter and got no rows, fall back to
     # fetching without the target filter: this helps the UI show data when
@@ -178,7 +219,7 @@ def fetch_activity_details_df(
         except Exception:
             pass
         # re-run the query without the target filter
-        q2 = "SELECT id, type, data, created_at FROM webhooks WHERE type = 'activity-details'"
+        q2 = f"SELECT {_LIST_COLUMNS} FROM webhooks WHERE type = 'activity-details'"
         params2 = []
         if since:
             q2 += " AND created_at >= %s"
@@ -186,23 +227,105 @@ def fetch_activity_details_df(
         q2 += " ORDER BY created_at DESC LIMIT %s"
         params2.append(limit)
         with db:
-            df = db.to_dataframe(q2, params=tuple(params2))
+            df = db.copy_to_dataframe(q2, params=tuple(params2), autocommit=True, text_columns=_LIST_TEXT_COLUMNS)
         # mark that we performed a fallback so callers (UI) can notify users
-        try:
-            df.attrs['fallback_to_unfiltered'] = True
-        except Exception:
-            # older pandas or unusual DF impl: ignore
-            pass
+        df.attrs['fallback_to_unfiltered'] = True
 
     if created_local:
         db.close()
     return df
 
 
+def fetch_activity_detail_by_id(activity_id: Any, db: Optional[PostgresDB] = None, path: str = "neondb_keys.json") -> Optional[ActivityDetails]:
+    """Fetch a single activity-details row (including its `data` payload) by id.
+
+    Returns None when no row matches.
+    """
+    created_local = False
+    if db is None:
+        db = get_postgresdb_from_neon_keys(path)
+        created_local = True
+
+    # ids coming from a DataFrame are numpy scalars, which psycopg2 cannot adapt
+    if hasattr(activity_id, "item"):
+        activity_id = activity_id.item()
+
+    q = "SELECT id, type, data, created_at FROM webhooks WHERE type = 'activity-details' AND id = %s"
+    with db:
+        records = db.to_records(q, params=(activity_id,), autocommit=True)
+
+    if created_local:
+        db.close()
+    if not records:
+        return None
+    return ActivityDetails.from_record(records[0])
+
+
+# Numeric fields of Garmin `samples`. They are built column-by-column straight
+# into float64 arrays (missing -> NaN) instead of letting pandas infer dtypes
+# row by row from the list of dicts.
+SAMPLE_NUMERIC_COLUMNS = (
+    "startTimeInSeconds",
+    "latitudeInDegree",
+    "longitudeInDegree",
+    "elevationInMeters",
+    "airTemperatureCelcius",
+    "heartRate",
+    "speedMetersPerSecond",
+    "stepsPerMinute",
+    "totalDistanceInMeters",
+    "powerInWatts",
+    "bikeCadenceInRPM",
+    "swimCadenceInStrokesPerMinute",
+    "wheelChairCadenceInPushesPerMinute",
+    "timerDurationInSeconds",
+    "clockDurationInSeconds",
+    "movingDurationInSeconds",
+)
+
+
+# Low-precision sensor channels (a few significant digits) that are stored as
+# float32 to halve memory and plot payload size. Distance and time stay
+# float64 since they are cumulative and get differenced.
+SAMPLE_FLOAT32_COLUMNS = (
+    "heartRate",
+    "speedMetersPerSecond",
+    "elevationInMeters",
+    "airTemperatureCelcius",
+    "powerInWatts",
+)
+
+
+def _samples_to_columns(samples: List[dict]) -> dict:
+    """Turn a list of sample dicts into a dict of column arrays.
+
+    Known numeric fields become float64 arrays; any other key is kept as an
+    object column. Column order follows the first sample, then extra keys.
+    """
+    n = len(samples)
+    keys = list(samples[0])
+    seen = set(keys)
+    keys.extend(sorted(set().union(*samples) - seen))
+
+    columns = {}
+    for key in keys:
+        if key not in SAMPLE_NUMERIC_COLUMNS:
+            columns[key] = [s.get(key) for s in samples]
+            continue
+        values = (s.get(key) for s in samples)
+        try:
+            columns[key] = np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=n)
+        except (TypeError, ValueError):
+            # unexpected non-numeric values: coerce them like pd.to_numeric
+            raw = pd.Series([s.get(key) for s in samples])
+            columns[key] = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=float)
+    return columns
+
+
 def extract_samples_from_detail(detail: dict) -> pd.DataFrame:
     """Extract and clean `samples` DataFrame from a single activity detail dict.
 
-    - Parses JSON-like `data['samples']` into a DataFrame.
+    - Decodes `data['samples']` column by column and builds the DataFrame once.
     - Computes `distanceDiff` and `secondsDiff` per sample.
     - Fills zero/na `speedMetersPerSecond` using distance/seconds when possible.
     - Converts `timerDurationInSeconds` to datetime (`timerDuration`).
@@ -211,45 +334,57 @@ def extract_samples_from_detail(detail: dict) -> pd.DataFrame:
     if not samples:
         return pd.DataFrame()
 
-    df = pd.DataFrame(samples)
+    # Work on the column arrays directly and build the DataFrame once at the
+    # end, so the diff / fill / filter chain never copies a whole frame.
+    columns = _samples_to_columns(samples)
+    n = len(samples)
 
-    # ensure numeric columns
-    for col in ("totalDistanceInMeters", "timerDurationInSeconds", "speedMetersPerSecond"):
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    def _first_diff(arr: Optional[np.ndarray]) -> np.ndarray:
+        # like Series.diff() but the first element keeps its own value
+        if arr is None:
+            return np.full(n, np.nan)
+        out = np.empty_like(arr)
+        out[:1] = arr[:1]
+        out[1:] = np.diff(arr)
+        return out
+
+    dist = columns.get("totalDistanceInMeters")
+    secs = columns.get("timerDurationInSeconds")
+    speed = columns.get("speedMetersPerSecond")
 
     # distance and time diffs
-    if "totalDistanceInMeters" in df.columns:
-        df["distanceDiff"] = df["totalDistanceInMeters"].diff()
-        df.loc[df.index[0], "distanceDiff"] = df.loc[df.index[0], "totalDistanceInMeters"]
-    else:
-        df["distanceDiff"] = pd.NA
-
-    if "timerDurationInSeconds" in df.columns:
-        df["secondsDiff"] = df["timerDurationInSeconds"].diff()
-        df.loc[df.index[0], "secondsDiff"] = df.loc[df.index[0], "timerDurationInSeconds"]
-    else:
-        df["secondsDiff"] = pd.NA
-
-    # filter out non-positive distance diffs
-    if "distanceDiff" in df.columns:
-        df = df[df["distanceDiff"] > 0]
-
-    # fill missing or zero speed by computing distance/seconds
-    if "speedMetersPerSecond" in df.columns:
-        mask = (df["speedMetersPerSecond"].isna()) | (df["speedMetersPerSecond"] == 0)
-        # avoid division by zero: coerce seconds to numeric and treat 0 as NA
-        safe_seconds = pd.to_numeric(df["secondsDiff"].replace({0: pd.NA}), errors="coerce")
-        # compute candidate speeds (distance / seconds) and only assign where valid
-        computed_speed = df["distanceDiff"].astype(float).divide(safe_seconds)
-        set_mask = mask & computed_speed.notna()
-        df.loc[set_mask, "speedMetersPerSecond"] = computed_speed.loc[set_mask]
+    dd = _first_diff(dist)
+    sd = _first_diff(secs)
+    columns["distanceDiff"] = dd
+    columns["secondsDiff"] = sd
+
+    # fill missing or zero speed by computing distance/seconds (a single masked
+    # divide; rows with non-positive seconds keep their original value)
+    if speed is not None:
+        computed = np.divide(dd, sd, out=np.full(n, np.nan), where=sd > 0)
+        set_mask = (np.isnan(speed) | (speed == 0)) & ~np.isnan(computed)
+        columns["speedMetersPerSecond"] = np.where(set_mask, computed, speed)
+
+    # filter out non-positive distance diffs (original row positions are kept as index)
+    index = None
+    if dist is not None:
+        keep = dd > 0
+        index = np.flatnonzero(keep)
+        for col, values in columns.items():
+            if isinstance(values, np.ndarray):
+                columns[col] = values[keep]
+            else:
+                columns[col] = list(compress(values, keep))
+
+    for col in SAMPLE_FLOAT32_COLUMNS:
+        if col in columns:
+            columns[col] = columns[col].astype(np.float32)
 
     # timerDuration as datetime (unit seconds)
-    if "timerDurationInSeconds" in df.columns:
-        df["timerDuration"] = pd.to_datetime(df["timerDurationInSeconds"], unit="s", errors="coerce")
+    if secs is not None:
+        columns["timerDuration"] = pd.to_datetime(columns["timerDurationInSeconds"], unit="s", errors="coerce")
 
-    return df
+    return pd.DataFrame(columns, index=index, copy=False)
 
 
 def extract_all_samples(data: dict) -> pd.DataFrame:
@@ -258,18 +393,65 @@ def extract_all_samples(data: dict) -> pd.DataFrame:
     Adds columns `activity_index` and `activity_id` (if present in detail).
     """
     activity_details = data.get("activityDetails") or []
+    # pass 1: extract every activity and record its length
     rows = []
+    idxs = []
+    ids = []
     for idx, detail in enumerate(activity_details):
         df = extract_samples_from_detail(detail)
         if df.empty:
             continue
-        # annotate with activity info
-        df = df.copy()
-        df["activity_index"] = idx
-        activity_id = detail.get("activityId") or detail.get("id")
-        df["activity_id"] = activity_id
         rows.append(df)
+        idxs.append(idx)
+        ids.append(detail.get("activityId") or detail.get("id"))
 
     if not rows:
         return pd.DataFrame()
-    return pd.concat(rows, ignore_index=True)
\ No newline at end of file
+
+    # pass 2: allocate each output column once and copy the slices into it
+    lengths = [len(r) for r in rows]
+    total = sum(lengths)
+    bounds = np.cumsum([0] + lengths)
+    # same column order as concatenating the annotated per-activity frames
+    columns = list(dict.fromkeys(col for r in rows for col in (*r.columns, "activity_index", "activity_id")))
+    annotations = {"activity_index": np.repeat(idxs, lengths), "activity_id": np.repeat(_activity_id_array(ids), lengths)}
+
+    out = {}
+    for col in columns:
+        if col in annotations:
+            out[col] = annotations[col]
+            continue
+        dtype, missing = _combined_column_dtype([r[col].dtype for r in rows if col in r.columns])
+        if any(col not in r.columns for r in rows) and dtype.kind in "iub":
+            dtype, missing = np.dtype(np.float64), np.nan
+        arr = np.empty(total, dtype=dtype)
+        for r, start, end in zip(rows, bounds[:-1], bounds[1:]):
+            arr[start:end] = r[col].to_numpy(dtype=dtype) if col in r.columns else missing
+        out[col] = arr
+    return pd.DataFrame(out, copy=False)
+
+
+def _activity_id_array(ids: List[Any]) -> np.ndarray:
+    """Activity ids as an array with the dtype pandas would infer (e.g. int64).
+
+    Falls back to object when an id is missing or the ids are strings.
+    """
+    if any(i is None for i in ids):
+        return np.array(ids, dtype=object)
+    arr = np.asarray(ids)
+    return arr.astype(object) if arr.dtype.kind in "USO" else arr
+
+
+def _combined_column_dtype(dtypes: List[Any]):
+    """Return (numpy dtype, missing-value filler) able to hold all `dtypes`.
+
+    Numeric columns are promoted (e.g. float32 + float64 -> float64), a single
+    datetime dtype is kept as-is and anything else falls back to object.
+    """
+    np_dtypes = [d if isinstance(d, np.dtype) else None for d in dtypes]
+    if all(d is not None and d.kind in "iufb" for d in np_dtypes):
+        dtype = np.result_type(*np_dtypes)
+        return dtype, np.nan
+    if all(d is not None and d.kind == "M" for d in np_dtypes) and len(set(np_dtypes)) == 1:
+        return np_dtypes[0], np.datetime64("NaT")
+    return np.dtype(object), None
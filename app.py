@@ -1,13 +1,16 @@
+import bisect
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+import pyarrow as pa
 from plotly.subplots import make_subplots
-import json
 from metrics import minutes_to_pace_str
 import pydeck as pdk
 
-from activity_details import fetch_activity_details_df, fetch_activity_details, ActivityDetails
+from activity_details import fetch_activity_details_df, fetch_activity_detail_by_id, ActivityDetails
 from db_connection import get_postgresdb_from_neon_keys
 import os
 from pathlib import Path
@@ -23,58 +26,176 @@ st.set_page_config(page_title="Garmin Activity Metrics", layout="wide")
 
 st.title("Métricas de actividades — Activity Details")
 
+# max options rendered in the activity selectbox (the rest is reachable via search)
+MAX_SELECT_OPTIONS = 200
+# max points drawn per metric trace (longer activities are decimated)
+MAX_PLOT_POINTS = 2000
+# max points drawn on the activity map (longer tracks are decimated)
+MAX_MAP_POINTS = 5000
+# map zoom by track span in degrees: span <= MAP_ZOOM_SPANS[i] -> MAP_ZOOM_LEVELS[i]
+MAP_ZOOM_SPANS = (0.005, 0.02, 0.05, 0.15, 0.5, 1.5)
+MAP_ZOOM_LEVELS = (16, 15, 14, 13, 12, 11, 9)
+
+SIDEBAR_CSS = """
+<style>
+/* Reduce font size for sidebar selectbox options and labels */
+section [data-testid="stSidebar"] .stSelectbox, section [data-testid="stSidebar"] select, section [data-testid="stSidebar"] div[role="listbox"] {
+    font-size: 12px !important;
+    line-height: 1.15 !important;
+}
+/* Try to allow options to wrap when long */
+div[role="option"] { white-space: normal !important; }
+</style>
+"""
+
+
+@st.cache_resource(on_release=lambda db: db.close())
+def get_db():
+    # One configured PostgresDB for the whole app: avoids re-reading config and
+    # lets every rerun borrow psycopg2 connections from the shared, already
+    # warm connection pool instead of opening a new one per query.
+    return get_postgresdb_from_neon_keys()
+
 
 @st.cache_data(ttl=300)
 def load_activity_list(limit: int = 200, target_user_id: str = None):
-    # Returns DataFrame of available activity-details (optionally filtered by target_user_id)
-    return fetch_activity_details_df(limit=limit, target_user_id=target_user_id)
+    # Returns (activity-details list as Arrow bytes, fallback_used). The flag
+    # tells whether the target_user_id filter matched nothing and the loader fell
+    # back to all activities; it is computed once here and cached with the frame.
+    # The frame is cached as Arrow IPC bytes: cache hits decode it in C
+    # (zero-copy for numeric columns) instead of unpickling a DataFrame.
+    df = fetch_activity_details_df(db=get_db(), limit=limit, target_user_id=target_user_id)
+    return frame_to_arrow_bytes(df), bool(df.attrs.get('fallback_to_unfiltered', False))
+
+
+def frame_to_arrow_bytes(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_bytes_to_frame(buf: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(buf).read_all().to_pandas()
+
+
+@st.cache_data(ttl=300, max_entries=64)
+def load_activity_by_id(activity_id):
+    # Loads (and parses) the full payload of a single activity on demand, so
+    # only the selected activity is kept in memory instead of the whole list.
+    return fetch_activity_detail_by_id(activity_id, db=get_db())
+
+
+@st.cache_data(ttl=600, max_entries=64)
+def get_samples_df(activity_id, _activity: ActivityDetails) -> pd.DataFrame:
+    # Cached on the activity id only (`_activity` is not hashed by Streamlit),
+    # so widget reruns reuse the parsed samples instead of re-extracting them.
+    samples = _activity.samples_df()
+    # everything downstream only renders (plotly / pydeck): float32 halves the
+    # payload sent to the browser
+    num_cols = samples.select_dtypes("float64").columns
+    if len(num_cols):
+        samples[num_cols] = samples[num_cols].astype("float32")
+    return samples
+
+
+@st.cache_data(ttl=600, max_entries=64)
+def build_metric_figure_json(activity_id, _samples: pd.DataFrame):
+    # Builds the per-metric subplot figure and caches its serialized JSON per
+    # activity id, so reruns do not rebuild/re-serialize every sample point.
+    # Returns None when none of the plotted metrics is present.
+    samples = _samples
+    xcol = 'timerDuration'
+
+    # Modern minimal athletic plots for selected metric columns
+    # Define display titles for known metrics
+    title_map = {
+        'heartRate': 'Heart Rate',
+        'totalDistanceInMeters': 'Total Distance In Meters',
+        'speedMetersPerSecond': 'Speed Meters Per Second',
+        'elevationInMeters': 'Elevation In Meters',
+        'airTemperatureCelcius': 'Air Temperature Celcius',
+        'powerInWatts': 'Power In Watts'
+    }
+
+    # Minimal, athletic-focused palette (calm dark + bright accents)
+    pal = {
+        'heartRate': '#FF6B6B',             # energetic coral (HR)
+        'totalDistanceInMeters': '#A3E635', # vivid lime (distance)
+        'speedMetersPerSecond': '#00C2FF',  # electric cyan (speed)
+        'elevationInMeters': '#94A3B8',     # cool gray-blue (elevation)
+        'airTemperatureCelcius': '#FFB86B', # warm amber (air temp)
+        'powerInWatts': '#8B5CF6'           # violet for power
+    }
+
+    # samples are normally already ordered by time: only sort when needed
+    td = samples[xcol].to_numpy()
+    if len(td) and not (td[1:] >= td[:-1]).all():
+        samples = samples.sort_values(by=xcol)
+    # order: baseline metrics, then air temp, then power (if present)
+    base_order = ['heartRate', 'totalDistanceInMeters', 'speedMetersPerSecond', 'elevationInMeters', 'airTemperatureCelcius']
+    present_cols = [c for c in base_order if c in samples.columns]
+    if 'powerInWatts' in samples.columns:
+        present_cols.append('powerInWatts')
+
+    if not present_cols:
+        return None
+
+    # a plot a few thousand pixels wide cannot show more points than that:
+    # decimate long activities with a fixed stride before building the traces
+    stride = max(1, -(-len(samples) // MAX_PLOT_POINTS))  # ceil: never more than MAX_PLOT_POINTS
+    if stride > 1:
+        samples = samples.iloc[::stride]
+
+    # build subplot with one row per metric and increased spacing
+    rows = len(present_cols)
+    fig = make_subplots(rows=rows, cols=1, shared_xaxes=True, vertical_spacing=0.06,
+                        subplot_titles=[title_map.get(c, c) for c in present_cols])
+
+    for i, col in enumerate(present_cols, start=1):
+        y = samples[col]
+        fig.add_trace(
+            go.Scatter(
+                x=samples[xcol],
+                y=y,
+                mode='lines',
+                name=col,
+                line=dict(color=pal.get(col, '#111111'), width=2.5),
+                hovertemplate='%{x}<br>' + title_map.get(col, col) + ': %{y}<extra></extra>'
+            ),
+            row=i, col=1
+        )
+        # axis title uses friendly name
+        fig.update_yaxes(title_text=title_map.get(col, col), row=i, col=1, showgrid=False)
+
+    # increase total height so subplots do not overlap
+    total_height = max(300, 240 * rows)
+    fig.update_layout(
+        template='simple_white',
+        height=total_height,
+        margin=dict(l=40, r=20, t=80, b=40),
+        showlegend=False,
+        plot_bgcolor='white'
+    )
 
+    # subtle horizontal baseline and thin grid for readability
+    for i in range(1, rows + 1):
+        fig.update_yaxes(row=i, col=1, gridcolor='#f2f4f7', zerolinecolor='#e6eef8')
 
-@st.cache_data(ttl=300)
-def load_activity_objects(limit: int = 200, target_user_id: str = None):
-    # Build ActivityDetails objects from the DataFrame loader so both
-    # representations stay consistent (and so we can detect fallback state).
-    df = load_activity_list(limit=limit, target_user_id=target_user_id)
-    results = []
-    if df is None or df.empty:
-        return results
-    for _, row in df.iterrows():
-        record = {col: row[col] for col in df.columns}
-        results.append(ActivityDetails.from_record(record))
-    return results
-
-
-def activity_to_label(rec: pd.Series) -> str:
-    cid = rec.get("id")
-    created = rec.get("created_at")
-    # Try to extract a human-friendly activity name from the payload
-    data_val = rec.get("data")
-    activity_name = None
-    if isinstance(data_val, str):
-        try:
-            data_val = json.loads(data_val)
-        except Exception:
-            pass
-
-    if isinstance(data_val, dict):
-        # common patterns: activityDetails -> [ { activityName: ... } ]
-        try:
-            if 'activityDetails' in data_val and isinstance(data_val['activityDetails'], list) and data_val['activityDetails']:
-                first = data_val['activityDetails'][0]
-                if isinstance(first, dict):
-                    activity_name = first.get('activityName') or first.get('activity_name') or first.get('name')
-        except Exception:
-            activity_name = None
-
-        if not activity_name:
-            activity_name = data_val.get('activityName') or data_val.get('activity_name') or data_val.get('name')
-
-    # Build label: prefer "created_at — activityName"; fallback to id if name missing
-    created_str = created if created is not None else ''
-    if activity_name:
-        return f"{created_str} — {activity_name}"
-    # fallback: show id and created
-    return f"{cid} — {created_str}"
+    return fig.to_json()
+
+
+def activity_labels(df: pd.DataFrame) -> list:
+    # Build all selectbox labels with column-wise string ops. Prefer
+    # "created_at — activityName"; fallback to "id — created_at" if name missing.
+    # `activity_name` is projected server-side from the payload by the list loader.
+    created = df["created_at"].astype(str).where(df["created_at"].notna(), "")
+    names = df["activity_name"]
+    has_name = names.notna() & (names.astype(str) != "")
+    named = created + " — " + names.astype(str)
+    fallback = df["id"].astype(str) + " — " + created
+    return named.where(has_name, fallback).tolist()
 
 
 def main():
@@ -84,7 +205,9 @@ def main():
 
     if refresh:
         load_activity_list.clear()
-        load_activity_objects.clear()
+        load_activity_by_id.clear()
+        get_samples_df.clear()
+        build_metric_figure_json.clear()
 
     # Load target_user_id from environment variables (if set). The app will
     # use it silently; no sidebar controls are shown to alter filtering.
@@ -95,22 +218,18 @@ def main():
     prev_target = st.session_state.get("last_effective_target", None)
     if prev_target != effective_target:
         load_activity_list.clear()
-        load_activity_objects.clear()
+        load_activity_by_id.clear()
+        get_samples_df.clear()
+        build_metric_figure_json.clear()
         st.session_state["last_effective_target"] = effective_target
 
-    df = load_activity_list(limit=limit, target_user_id=effective_target)
-    items = load_activity_objects(limit=limit, target_user_id=effective_target)
+    df_bytes, fallback_used = load_activity_list(limit=limit, target_user_id=effective_target)
+    df = arrow_bytes_to_frame(df_bytes)
 
     # No manual DB diagnostics in the sidebar per user request.
 
     # If the loader performed a fallback (filtered -> unfiltered), show a
     # generic warning but do NOT display the target id in the UI.
-    fallback_used = False
-    try:
-        fallback_used = bool(df.attrs.get('fallback_to_unfiltered', False))
-    except Exception:
-        fallback_used = False
-
     if fallback_used:
         st.warning("No se encontró el usuario indicado; se muestran todas las actividades.")
 
@@ -124,7 +243,7 @@ def main():
         # Offer quick raw DB check in-page
         if st.button("Ver conteo crudo (sin filtro)"):
             try:
-                db = get_postgresdb_from_neon_keys()
+                db = get_db()
                 with db:
                     cnt = db.execute("SELECT count(*) FROM webhooks WHERE type = 'activity-details'", fetchone=True)
                     st.info(f"Filas activity-details (sin filtrar): {cnt[0] if cnt else 0}")
@@ -139,41 +258,41 @@ def main():
 
     # Selection
     st.sidebar.markdown(f"**Actividades cargadas:** {len(df)}")
-    # Inject small CSS to make the sidebar selectbox font smaller and allow wrapping
-    st.sidebar.markdown(
-        """
-        <style>
-        /* Reduce font size for sidebar selectbox options and labels */
-        section [data-testid="stSidebar"] .stSelectbox, section [data-testid="stSidebar"] select, section [data-testid="stSidebar"] div[role="listbox"] {
-            font-size: 12px !important;
-            line-height: 1.15 !important;
-        }
-        /* Try to allow options to wrap when long */
-        div[role="option"] { white-space: normal !important; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    # Inject small CSS to make the sidebar selectbox font smaller and allow wrapping.
+    # It must be emitted on every run: Streamlit drops elements a rerun does not
+    # re-emit, so a "once per session" guard would lose the styling; the string
+    # itself is a module constant and unchanged elements are not re-sent.
+    st.sidebar.markdown(SIDEBAR_CSS, unsafe_allow_html=True)
+
+    labels = activity_labels(df)
+    # Narrow the options with a text filter so the selectbox never has to render
+    # thousands of entries; at most MAX_SELECT_OPTIONS (most recent first) are shown.
+    query = st.sidebar.text_input("Buscar actividad", value="").strip()
+    if query:
+        matches = pd.Series(labels).str.contains(query, case=False, regex=False)
+        positions = matches[matches].index.tolist()
+    else:
+        positions = list(range(len(labels)))
+    if not positions:
+        st.sidebar.info("Ninguna actividad coincide con la búsqueda.")
+        return
+    if len(positions) > MAX_SELECT_OPTIONS:
+        st.sidebar.caption(f"Mostrando {MAX_SELECT_OPTIONS} de {len(positions)} actividades; refina la búsqueda.")
+        positions = positions[:MAX_SELECT_OPTIONS]
 
-    labels = [activity_to_label(df.iloc[i]) for i in range(len(df))]
-    # Use selectbox showing "fecha — activityName" (or fallback). We keep the labels list and
-    # map selection back to index so underlying logic is unchanged.
-    sel = st.sidebar.selectbox("Seleccionar actividad", options=labels)
-    sel_idx = labels.index(sel)
+    # Use selectbox showing "fecha — activityName" (or fallback). Options are row
+    # positions in `df`, so the selection maps straight back to its row.
+    sel_idx = st.sidebar.selectbox("Seleccionar actividad", options=positions, format_func=lambda i: labels[i])
 
     # show selected summary
     rec = df.iloc[sel_idx]
+    # only the selected row's full payload is fetched from the DB
+    activity_obj = load_activity_by_id(rec.get("id"))
     st.subheader("Actividad seleccionada")
     col1, col2 = st.columns([2, 3])
     with col1:
         # Mostrar métricas resumidas desde activityDetails -> summary
-        data_val = rec.get("data")
-        if isinstance(data_val, str):
-            try:
-                data_val = json.loads(data_val)
-            except Exception:
-                pass
-
+        data_val = activity_obj.data if activity_obj is not None else None
         detail = data_val
         if isinstance(data_val, dict) and isinstance(data_val.get('activityDetails'), list) and data_val.get('activityDetails'):
             detail = data_val.get('activityDetails')[0]
@@ -194,7 +313,8 @@ def main():
             'totalElevationGainInMeters', 'totalElevationLossInMeters'
         ]
 
-        rows = []
+        # one display value per metric; the table is built column-wise below
+        values = []
         for k in metrics_keys:
             val = None
             if isinstance(summary, dict):
@@ -229,23 +349,20 @@ def main():
                     disp = f"{float(val):.0f} kcal"
                 except Exception:
                     disp = val
-            rows.append({'metric': k, 'value': disp})
+            values.append(disp)
 
-        if rows:
-            st.table(pd.DataFrame(rows))
+        if values:
+            st.table(pd.DataFrame({'metric': metrics_keys, 'value': values}))
         else:
             st.write("(sin resumen disponible)")
     # removed detailed raw payload summary per user request
 
-    # build ActivityDetails object for selected
-    activity_obj = items[sel_idx] if len(items) > sel_idx else None
-
     st.markdown("---")
     st.subheader("Muestras (samples)")
     if activity_obj is None:
         st.info("No hay objeto `ActivityDetails` disponible para esta fila.")
     else:
-        samples = activity_obj.samples_df()
+        samples = get_samples_df(rec.get("id"), activity_obj)
         if samples.empty:
             st.info("No se encontraron samples para esta actividad.")
         else:
@@ -258,144 +375,58 @@ def main():
 
             # Check monotonicity of timerDuration (if present)
             if 'timerDuration' in samples.columns:
-                try:
-                    td = samples['timerDuration']
-                    # if not monotonic increasing, warn (could indicate duplicates or bad ordering)
-                    if not td.is_monotonic_increasing:
-                        st.warning('La columna `timerDuration` no es monótona creciente — los samples pueden estar desordenados o duplicados.')
-                except Exception:
-                    pass
-
-            # Check for coordinate completeness
-            if "latitudeInDegree" in samples.columns and "longitudeInDegree" in samples.columns:
-                coord_count = samples.dropna(subset=["latitudeInDegree", "longitudeInDegree"]).shape[0]
+                td = samples['timerDuration'].to_numpy()
+                # if not monotonic increasing, warn (could indicate duplicates or bad ordering)
+                if not bool(np.all(td[1:] >= td[:-1])):
+                    st.warning('La columna `timerDuration` no es monótona creciente — los samples pueden estar desordenados o duplicados.')
+
+            # Check for coordinate completeness; the validity mask is reused for the map below
+            has_coords = "latitudeInDegree" in samples.columns and "longitudeInDegree" in samples.columns
+            if has_coords:
+                lat = samples["latitudeInDegree"].to_numpy()
+                lon = samples["longitudeInDegree"].to_numpy()
+                coord_mask = ~(np.isnan(lat) | np.isnan(lon))
+                coord_count = int(coord_mask.sum())
                 if coord_count == 0:
                     st.warning('No hay coordenadas en los samples de esta actividad.')
                 elif coord_count < max(5, int(0.2 * n_samples)):
                     st.warning(f'Muy pocas coordenadas válidas ({coord_count}/{n_samples}) — el trazado puede ser incompleto.')
 
-            # Modern minimal athletic plots for selected metric columns
-            # Define display titles for known metrics
-            title_map = {
-                'heartRate': 'Heart Rate',
-                'totalDistanceInMeters': 'Total Distance In Meters',
-                'speedMetersPerSecond': 'Speed Meters Per Second',
-                'elevationInMeters': 'Elevation In Meters',
-                'airTemperatureCelcius': 'Air Temperature Celcius',
-                'powerInWatts': 'Power In Watts'
-            }
-
-            def _palette():
-                # Minimal, athletic-focused palette (calm dark + bright accents)
-                return {
-                    'heartRate': '#FF6B6B',             # energetic coral (HR)
-                    'totalDistanceInMeters': '#A3E635', # vivid lime (distance)
-                    'speedMetersPerSecond': '#00C2FF',  # electric cyan (speed)
-                    'elevationInMeters': '#94A3B8',     # cool gray-blue (elevation)
-                    'airTemperatureCelcius': '#FFB86B', # warm amber (air temp)
-                    'powerInWatts': '#8B5CF6'           # violet for power
-                }
-
-            pal = _palette()
-
             # ensure timerDuration exists and is datetime-like
-            xcol = 'timerDuration' if 'timerDuration' in samples.columns else None
-            if xcol is None:
+            if 'timerDuration' not in samples.columns:
                 st.info('No hay columna `timerDuration` para graficar series temporales.')
             else:
-                samples = samples.sort_values(by=xcol)
-                # order: baseline metrics, then air temp, then power (if present)
-                base_order = ['heartRate', 'totalDistanceInMeters', 'speedMetersPerSecond', 'elevationInMeters', 'airTemperatureCelcius']
-                present_cols = [c for c in base_order if c in samples.columns]
-                if 'powerInWatts' in samples.columns:
-                    present_cols.append('powerInWatts')
-
-                if not present_cols:
+                fig_json = build_metric_figure_json(rec.get("id"), samples)
+                if fig_json is None:
                     st.info('Ninguna de las columnas solicitadas está presente en los samples.')
                 else:
-                    # build subplot with one row per metric and increased spacing
-                    rows = len(present_cols)
-                    fig = make_subplots(rows=rows, cols=1, shared_xaxes=True, vertical_spacing=0.06,
-                                        subplot_titles=[title_map.get(c, c) for c in present_cols])
-
-                    for i, col in enumerate(present_cols, start=1):
-                        y = samples[col]
-                        fig.add_trace(
-                            go.Scatter(
-                                x=samples[xcol],
-                                y=y,
-                                mode='lines',
-                                name=col,
-                                line=dict(color=pal.get(col, '#111111'), width=2.5),
-                                hovertemplate='%{x}<br>' + title_map.get(col, col) + ': %{y}<extra></extra>'
-                            ),
-                            row=i, col=1
-                        )
-                        # axis title uses friendly name
-                        fig.update_yaxes(title_text=title_map.get(col, col), row=i, col=1, showgrid=False)
-
-                    # increase total height so subplots do not overlap
-                    total_height = max(300, 240 * rows)
-                    fig.update_layout(
-                        template='simple_white',
-                        height=total_height,
-                        margin=dict(l=40, r=20, t=80, b=40),
-                        showlegend=False,
-                        plot_bgcolor='white'
-                    )
-
-                    # subtle horizontal baseline and thin grid for readability
-                    for i in range(1, rows + 1):
-                        fig.update_yaxes(row=i, col=1, gridcolor='#f2f4f7', zerolinecolor='#e6eef8')
-
-                    st.plotly_chart(fig, width='stretch')
+                    st.plotly_chart(pio.from_json(fig_json), width='stretch')
 
             # map if coordinates available
-            if "latitudeInDegree" in samples.columns and "longitudeInDegree" in samples.columns:
-                coords = samples.dropna(subset=["latitudeInDegree", "longitudeInDegree"]).copy()
-                if not coords.empty:
-                    coords = coords.rename(columns={"latitudeInDegree": "lat", "longitudeInDegree": "lon"})
-                    # use pydeck ScatterplotLayer to control point size (smaller points)
-                    try:
-                        mid_lat = float(coords['lat'].mean())
-                        mid_lon = float(coords['lon'].mean())
-                    except Exception:
-                        mid_lat = coords['lat'].iloc[0]
-                        mid_lon = coords['lon'].iloc[0]
-
-                    # compute bounds and choose a zoom that fits all points but stays closer
-                    lat_min = float(coords['lat'].min())
-                    lat_max = float(coords['lat'].max())
-                    lon_min = float(coords['lon'].min())
-                    lon_max = float(coords['lon'].max())
-                    lat_span = lat_max - lat_min
-                    lon_span = lon_max - lon_min
-                    max_span = max(lat_span, lon_span)
+            if has_coords:
+                # (lon, lat) pairs of the valid samples, straight from the numpy columns
+                pts = np.column_stack([lon[coord_mask], lat[coord_mask]])
+                if len(pts):
+                    # compute bounds in one pass per axis and choose a zoom that fits all points but stays closer
+                    lon_min, lat_min = (float(v) for v in pts.min(axis=0))
+                    lon_max, lat_max = (float(v) for v in pts.max(axis=0))
+                    max_span = max(lat_max - lat_min, lon_max - lon_min)
 
                     # heuristic zoom mapping: smaller span -> higher zoom
-                    if max_span <= 0.005:
-                        zoom = 16
-                    elif max_span <= 0.02:
-                        zoom = 15
-                    elif max_span <= 0.05:
-                        zoom = 14
-                    elif max_span <= 0.15:
-                        zoom = 13
-                    elif max_span <= 0.5:
-                        zoom = 12
-                    elif max_span <= 1.5:
-                        zoom = 11
-                    else:
-                        zoom = 9
+                    zoom = MAP_ZOOM_LEVELS[bisect.bisect_left(MAP_ZOOM_SPANS, max_span)]
 
                     center_lat = (lat_min + lat_max) / 2.0
                     center_lon = (lon_min + lon_max) / 2.0
 
+                    # decimate long tracks (bounds above still use every point)
+                    stride = max(1, -(-len(pts) // MAX_MAP_POINTS))  # ceil: never more than MAX_MAP_POINTS
+                    map_points = [{"position": p} for p in pts[::stride].tolist()]
+
                     # smaller point radius so markers don't cover the map
                     layer = pdk.Layer(
                         "ScatterplotLayer",
-                        data=coords,
-                        get_position='[lon, lat]',
+                        data=map_points,
+                        get_position='position',
                         get_radius=6,
                         radius_scale=1,
                         get_fill_color=[2, 119, 189, 200],
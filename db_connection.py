@@ -1,12 +1,156 @@
+import atexit
+import contextlib
+import functools
+import hashlib
+import io
 import json
 import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+from psycopg2 import sql
 import pandas as pd
 import numpy as np
 from typing import Optional, Dict, Any
 import urllib.parse
 import logging
+import re
+import select
+import threading
+import uuid
+import warnings
+import weakref
+
+# SQLAlchemy is optional: only used by to_dataframe(use_engine=True)
+try:
+    from sqlalchemy import create_engine
+except ImportError:
+    create_engine = None
+
+# Prefer orjson (much faster on large Garmin payloads); fall back to stdlib json
+try:
+    import orjson
+    loads_json = orjson.loads
+except Exception:
+    loads_json = json.loads
+
+# Have psycopg2 decode json/jsonb columns with `loads_json` on every connection
+# (including the ones SQLAlchemy opens), so payloads arrive as dicts and are
+# parsed exactly once.
+psycopg2.extras.register_default_json(globally=True, loads=loads_json)
+psycopg2.extras.register_default_jsonb(globally=True, loads=loads_json)
+
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+
+
+def _skip_quoted(query: str, i: int) -> int:
+    """Return the index just past the quoted literal starting at `query[i]`.
+
+    Handles `'...'` (with `''` escapes, and backslash escapes for `E'...'`),
+    `"..."` identifiers and `$tag$...$tag$` bodies. Returns `i` if `query[i]`
+    does not open one, and -1 if it is never closed.
+    """
+    ch = query[i]
+    if ch in "'\"":
+        backslash = ch == "'" and i > 0 and query[i - 1] in "eE"
+        j = i + 1
+        while j < len(query):
+            if backslash and query[j] == "\\":
+                j += 2
+                continue
+            if query[j] == ch:
+                if query[j + 1:j + 2] == ch:  # doubled quote: escaped
+                    j += 2
+                    continue
+                return j + 1
+            j += 1
+        return -1
+    if ch == "$":
+        m = _DOLLAR_TAG.match(query, i)
+        if not m:
+            return i
+        end = query.find(m.group(0), m.end())
+        return -1 if end < 0 else end + len(m.group(0))
+    return i
+
+
+def _split_insert_values(query: str) -> Optional[tuple]:
+    """Split `INSERT ... VALUES (<row>) <tail>` into (`INSERT ... VALUES %s <tail>`, `(<row>)`).
+
+    Quoted literals inside the row are skipped, so a `)` in `'x)'` does not end
+    it. Returns None if `query` is not a single-row INSERT ... VALUES statement:
+    unterminated quotes, or placeholders / further rows after the row.
+    """
+    m = re.match(r"\s*INSERT\b.*?\bVALUES\s*\(", query, flags=re.IGNORECASE | re.DOTALL)
+    if not m:
+        return None
+    start = m.end() - 1
+    depth = 0
+    i = start
+    while i < len(query):
+        ch = query[i]
+        if ch in "'\"$":
+            end = _skip_quoted(query, i)
+            if end < 0:
+                return None
+            if end > i:
+                i = end
+                continue
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                tail = query[i + 1:]
+                if "%" in tail or tail.lstrip().startswith(","):
+                    return None
+                return query[:start] + "%s" + tail, query[start:i + 1]
+        i += 1
+    return None
+
+
+# statements that can change session-level settings of a pooled connection
+_SESSION_STATE_RE = re.compile(r"^\s*(SET(?!\s+(LOCAL|TRANSACTION)\b)|RESET)\b|\bset_config\s*\(", re.IGNORECASE | re.MULTILINE)
+
+
+def _is_whole_float(col: pd.Series) -> bool:
+    """True for a float column whose non-NaN values are all exact integers.
+
+    pandas stores an integer column with missing values as float, so to_csv
+    writes `100.0`, which COPY rejects for an `int` target.
+    """
+    if col.dtype.kind != "f":
+        return False
+    values = col.to_numpy()
+    values = values[~np.isnan(values)]
+    return bool(values.size) and bool(np.all(np.abs(values) < 2 ** 53)) and bool(np.all(values == np.trunc(values)))
+
+
+class _WarmConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that keeps up to `maxconn` idle connections.
+
+    The stock pool only retains `minconn` returned connections and closes the
+    rest; here `minconn` is just how many are opened up front.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # putconn() keeps a returned connection while len(_pool) < minconn
+        self.minconn = maxconn
+
 
 class PostgresDB:
+    # SQLAlchemy engines shared by every instance, keyed by connection URI, so
+    # re-creating a PostgresDB (or closing it) keeps reusing the same pool.
+    _engines: Dict[str, Any] = {}
+    _engines_lock = threading.Lock()
+    # DBAPI connection pools, keyed the same way by connect() kwargs; the
+    # prepared statements of each pooled session are tracked alongside it
+    _pools: Dict[tuple, Any] = {}
+    _pools_lock = threading.Lock()
+    _prepared_by_conn = weakref.WeakKeyDictionary()
+    pool_minconn = 1
+    pool_maxconn = 10
+
     def __init__(self, host="localhost", port=5432, dbname=None, user=None, password=None, connect_timeout=10):
         # sslmode: e.g. 'require' or 'disable' or 'prefer'
         self.sslmode = None
@@ -17,12 +161,23 @@ class PostgresDB:
         self.password = password
         self.connect_timeout = connect_timeout
         self._engine = None
-        self.conn = None
+        # name -> (server-side name, PREPARE-able SQL with $n placeholders, number of parameters)
+        self._statements: Dict[str, tuple] = {}
+        # the DBAPI connection is per thread so one instance can be shared
+        # (e.g. via st.cache_resource) by concurrent Streamlit sessions
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        return getattr(self._local, "conn", None)
+
+    @conn.setter
+    def conn(self, value):
+        self._local.conn = value
 
     @classmethod
     def from_config(cls, path):
-        with open(path, "r", encoding="utf-8") as f:
-            cfg = json.load(f)
+        cfg = loads_json(Path(path).read_bytes())
         return cls(
             host=cfg.get("host", "localhost"),
             port=cfg.get("port", 5432),
@@ -45,23 +200,118 @@ class PostgresDB:
         )
         if getattr(self, "sslmode", None):
             connect_kwargs["sslmode"] = self.sslmode
-        self.conn = psycopg2.connect(**connect_kwargs)
+        pool = self._get_pool(connect_kwargs)
+        while True:
+            try:
+                conn = pool.getconn()
+            except psycopg2.pool.PoolError:
+                # pool exhausted: fall back to a dedicated connection
+                pool = None
+                conn = psycopg2.connect(**connect_kwargs)
+                break
+            if self._is_alive(conn):
+                break
+            # server dropped it (e.g. Neon suspended an idle compute): discard
+            pool.putconn(conn, close=True)
+        self._local.pool = pool
+        # set once a statement may have changed session settings (see _reset_session)
+        self._local.dirty = False
+        self.conn = conn
         self.conn.autocommit = False
+        # server-side prepared statements live in the (possibly reused) session
+        with self._pools_lock:
+            self._local.prepared = self._prepared_by_conn.setdefault(conn, set())
+
+    @staticmethod
+    def _is_alive(conn):
+        """
+        Liveness check for an idle pooled connection without a round-trip: a
+        connection the server has terminated has its FATAL message / EOF
+        waiting on the socket, which poll() turns into an error.
+        """
+        try:
+            for _ in range(4):
+                if conn.closed or not select.select([conn], [], [], 0)[0]:
+                    break
+                conn.poll()
+        except (psycopg2.Error, OSError, ValueError):
+            return False
+        return not conn.closed and conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+
+    def _reset_session(self):
+        """
+        Make a pooled session clean for the next borrower: roll back whatever
+        is still open (a no-op after `with db:` committed) and, if a statement
+        may have changed session settings (see _SESSION_STATE_RE), `RESET ALL`.
+        Prepared statements are kept. Nothing is sent for a clean, idle session.
+        """
+        conn = self.conn
+        conn.rollback()
+        if getattr(self._local, "dirty", False):
+            with self._autocommit(), conn.cursor() as cur:
+                cur.execute("RESET ALL")
+            self._local.dirty = False
+
+    @classmethod
+    def _get_pool(cls, connect_kwargs):
+        key = tuple(sorted((k, v) for k, v in connect_kwargs.items() if v is not None))
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None or pool.closed:
+                # getconn() pops the most recently returned connection (LIFO),
+                # so the warmest session is reused first
+                pool = _WarmConnectionPool(cls.pool_minconn, cls.pool_maxconn, **connect_kwargs)
+                cls._pools[key] = pool
+            return pool
 
     def close(self):
-        if self.conn and getattr(self.conn, "closed", 1) == 0:
+        pool = getattr(self._local, "pool", None)
+        if pool is not None and self.conn is not None:
+            # hand the connection back to the pool, rolled back and reset;
+            # a connection that fails that (or is closed) is discarded
+            discard = bool(self.conn.closed)
+            if not discard:
+                try:
+                    self._reset_session()
+                except psycopg2.Error:
+                    discard = True
+            try:
+                pool.putconn(self.conn, close=discard)
+            except psycopg2.pool.PoolError:
+                pass
+            finally:
+                self.conn = None
+                self._local.pool = None
+        elif self.conn and getattr(self.conn, "closed", 1) == 0:
             try:
                 self.conn.close()
             finally:
                 self.conn = None
-        # dispose sqlalchemy engine if created
-        if getattr(self, "_engine", None) is not None:
+        # the sqlalchemy engine is shared (see `_engines`): keep its pool alive
+        # and only drop our reference; use `dispose_engines()` to close pools
+        self._engine = None
+
+    @classmethod
+    def dispose_engines(cls):
+        with cls._engines_lock:
+            engines = list(cls._engines.values())
+            cls._engines.clear()
+        for engine in engines:
             try:
-                self._engine.dispose()
+                engine.dispose()
+            except Exception:
+                pass
+
+    @classmethod
+    def close_pools(cls):
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            try:
+                pool.closeall()
             except Exception:
                 pass
-            finally:
-                self._engine = None
 
     def __enter__(self):
         self.connect()
@@ -72,19 +322,44 @@ class PostgresDB:
             return
         try:
             if exc_type:
-                self.conn.rollback()
+                # the server may have dropped the session mid-block
+                if not self.conn.closed:
+                    self.conn.rollback()
             else:
                 self.conn.commit()
         finally:
             self.close()
 
-    def execute(self, query, params=None, fetchone=False, fetchall=False):
+    @contextlib.contextmanager
+    def _autocommit(self, enabled=True):
+        """
+        Run the body in autocommit mode, so a single statement sends no
+        BEGIN/COMMIT. It does not make the session read-only. Only applied when
+        no transaction is open on the connection (otherwise the body joins it);
+        the previous mode is restored afterwards.
+        """
+        conn = self.conn
+        if not enabled or conn.autocommit or conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            yield
+            return
+        conn.autocommit = True
+        try:
+            yield
+        finally:
+            if not conn.closed:
+                conn.autocommit = False
+
+    def execute(self, query, params=None, fetchone=False, fetchall=False, autocommit=False):
         """
         Execute a statement. Use fetchone or fetchall to return results as tuples.
         For SELECTs and to get a DataFrame, use to_dataframe().
+        `autocommit=True` runs the statement in autocommit mode (see _autocommit).
         """
         self.connect()
-        with self.conn.cursor() as cur:
+        if _SESSION_STATE_RE.search(query if isinstance(query, str) else ""):
+            # session settings changed: reset them before the pool reuses the connection
+            self._local.dirty = True
+        with self._autocommit(autocommit), self.conn.cursor() as cur:
             cur.execute(query, params)
             if fetchone:
                 return cur.fetchone()
@@ -93,40 +368,286 @@ class PostgresDB:
             # return affected rows by default
             return cur.rowcount
 
-    def executemany(self, query, params_list):
+    def prepare(self, name, query):
+        """
+        Register `query` (positional `%s` placeholders) as prepared statement `name`.
+        It is parsed and planned by the server once per connection, on first use
+        by execute_prepared(); later calls only bind parameters. The server-side
+        name is derived from the SQL text, so redefining `name` (or another
+        instance using the same name on a pooled connection) never runs a stale
+        statement.
+        """
+        if "%(" in query:
+            raise ValueError("prepared statements only support positional %s placeholders")
+        nparams = 0
+
+        def _placeholder(m):
+            nonlocal nparams
+            if m.group(1) == "%":
+                return "%"
+            nparams += 1
+            return f"${nparams}"
+
+        server_query = re.sub(r"%(%|s)", _placeholder, query)
+        server_name = "ps_" + hashlib.sha1(server_query.encode("utf-8")).hexdigest()[:24]
+        self._statements[name] = (server_name, server_query, nparams)
+
+    def execute_prepared(self, name, params=(), fetchone=False, fetchall=False):
+        """
+        Execute the statement registered with prepare(); same return values as execute().
+        """
+        server_name, server_query, nparams = self._statements[name]
         self.connect()
         with self.conn.cursor() as cur:
-            cur.executemany(query, params_list)
+            if server_name not in self._local.prepared:
+                cur.execute(sql.SQL("PREPARE {} AS ").format(sql.Identifier(server_name)) + sql.SQL(server_query))
+                self._local.prepared.add(server_name)
+            if nparams:
+                stmt = sql.SQL("EXECUTE {} ({})").format(sql.Identifier(server_name), sql.SQL(", ").join(sql.Placeholder() * nparams))
+            else:
+                stmt = sql.SQL("EXECUTE {}").format(sql.Identifier(server_name))
+            cur.execute(stmt, params or None)
+            if fetchone:
+                return cur.fetchone()
+            if fetchall:
+                return cur.fetchall()
             return cur.rowcount
 
-    def to_dataframe(self, query, params=None):
+    def executemany(self, query, params_list, page_size=1000):
         """
-        Run a SELECT and return a pandas DataFrame.
+        Execute `query` for every params tuple/dict in `params_list`, in pages.
+
+        `INSERT ... VALUES (...)` statements are rewritten to a single
+        multi-row `VALUES` per page (psycopg2 `execute_values`), so a page costs
+        one round-trip. Other statements (and INSERTs whose row cannot be
+        split out) go through `execute_batch`, one joined query per page.
+        Returns the number of inserted rows for rewritten INSERTs; for other
+        statements the driver's rowcount, which psycopg2 only reports for the
+        last statement of the last page.
         """
+        params_list = list(params_list)
         self.connect()
-        # Prefer using SQLAlchemy engine with pandas to avoid DBAPI2 warnings
-        try:
-            from sqlalchemy import create_engine
+        with self.conn.cursor() as cur:
+            split = _split_insert_values(query)
+            if split is None:
+                for start in range(0, len(params_list), page_size):
+                    page = params_list[start:start + page_size]
+                    psycopg2.extras.execute_batch(cur, query, page, page_size=page_size)
+                return cur.rowcount
+            stmt, template = split
+            total = 0
+            for start in range(0, len(params_list), page_size):
+                page = params_list[start:start + page_size]
+                psycopg2.extras.execute_values(cur, stmt, page, template=template, page_size=page_size)
+                total += max(cur.rowcount, 0)
+            return total
+
+    def insert_many(self, table, columns, rows, page_size=1000):
+        """
+        Insert `rows` (sequences ordered like `columns`) into `table` with one
+        multi-row `INSERT ... VALUES` per page (psycopg2 `execute_values`).
+        Identifiers are quoted; `table` may be schema-qualified. For very large
+        loads prefer copy_from_dataframe(). Returns the number of inserted rows.
+        """
+        columns = list(columns)
+        stmt = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+            sql.Identifier(*table.split(".")),
+            sql.SQL(", ").join(sql.Identifier(c) for c in columns),
+        )
+        template = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        rows = list(rows)
+        self.connect()
+        total = 0
+        with self.conn.cursor() as cur:
+            insert_sql = stmt.as_string(cur)
+            for start in range(0, len(rows), page_size):
+                page = rows[start:start + page_size]
+                psycopg2.extras.execute_values(cur, insert_sql, page, template=template, page_size=page_size)
+                total += max(cur.rowcount, 0)
+        return total
+
+    def copy_from_dataframe(self, df, table, columns=None, chunk_rows=100_000):
+        """
+        Bulk-load `df` into `table` with `COPY ... FROM STDIN` (CSV).
+        Preferred over executemany() for large ingests (> ~10k rows). Rows are
+        streamed in `chunk_rows` slices through one reused buffer to bound memory.
+        `columns` defaults to `df.columns`; `table` may be schema-qualified.
+        Values are written with `DataFrame.to_csv`, so serialize JSON columns
+        (e.g. with json.dumps) beforehand. Float columns holding only whole
+        numbers (integer columns with NaN) are written as integers, so they
+        load into `int` columns. Returns the number of rows copied.
+        """
+        columns = list(columns) if columns is not None else list(df.columns)
+        whole = {c: "Int64" for c in columns if _is_whole_float(df[c])}
+        stmt = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')").format(
+            sql.Identifier(*table.split(".")),
+            sql.SQL(", ").join(sql.Identifier(c) for c in columns),
+        )
+        self.connect()
+        buf = io.StringIO()
+        total = 0
+        with self.conn.cursor() as cur:
+            copy_sql = stmt.as_string(cur)
+            for start in range(0, len(df), chunk_rows):
+                chunk = df.iloc[start:start + chunk_rows]
+                if whole:
+                    chunk = chunk.astype(whole)
+                buf.seek(0)
+                buf.truncate()
+                chunk.to_csv(buf, columns=columns, index=False, header=False, na_rep="\\N")
+                buf.seek(0)
+                cur.copy_expert(copy_sql, buf)
+                total += len(chunk)
+        return total
+
+    def to_records(self, query, params=None, autocommit=False):
+        """
+        Run a SELECT and return the rows as a list of dicts (column -> value).
+        Skips DataFrame construction for callers that consume rows one by one.
+        """
+        self.connect()
+        with self._autocommit(autocommit), self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(query, params)
+            return [dict(r) for r in cur.fetchall()]
+
+    def iter_records(self, query, params=None, itersize=500, name=None):
+        """
+        Run a SELECT through a server-side (named) cursor and yield rows as dicts.
+        Rows are fetched from the server `itersize` at a time, so peak memory does
+        not grow with the size of the result set. Consume it inside a transaction
+        (e.g. within `with db:`). The cursor gets a unique name unless `name` is given.
+        """
+        self.connect()
+        with self.conn.cursor(name=name or f"records_stream_{uuid.uuid4().hex}", cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.itersize = itersize
+            cur.execute(query, params)
+            for row in cur:
+                yield dict(row)
 
-            user_quoted = urllib.parse.quote_plus(self.user) if self.user else ""
-            pwd_quoted = urllib.parse.quote_plus(self.password) if self.password else ""
-            host = self.host or "localhost"
-            port = int(self.port or 5432)
-            dbname = self.dbname or ""
-            sslmode = getattr(self, "sslmode", None)
+    def iter_dataframe(self, query, params=None, chunksize=10000):
+        """
+        Run a SELECT through a server-side (named) cursor and yield DataFrames of
+        at most `chunksize` rows, so large results never sit in memory at once.
+        Consume it inside a transaction (e.g. within `with db:`).
+        """
+        self.connect()
+        with self.conn.cursor(name=f"df_stream_{uuid.uuid4().hex}") as cur:
+            cur.itersize = chunksize
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield pd.DataFrame(rows, columns=[c.name for c in cur.description])
 
-            uri = f"postgresql+psycopg2://{user_quoted}:{pwd_quoted}@{host}:{port}/{dbname}"
-            if sslmode:
-                uri = uri + f"?sslmode={sslmode}"
+    def to_dataframe_fast(self, query, params=None, chunksize=50000, dtypes=None):
+        """
+        Build a DataFrame column by column from a server-side cursor, skipping
+        pandas.read_sql and its intermediate list of row tuples. `dtypes` maps
+        column name -> numpy dtype; other columns keep pandas' inference.
+        """
+        self.connect()
+        dtypes = dtypes or {}
+        with self.conn.cursor(name=f"df_fast_{uuid.uuid4().hex}") as cur:
+            cur.itersize = chunksize
+            cur.execute(query, params)
+            rows = cur.fetchmany(chunksize)
+            names = [c.name for c in cur.description]
+            buffers = [[] for _ in names]
+            while rows:
+                for buf, values in zip(buffers, zip(*rows)):
+                    buf.extend(values)
+                rows = cur.fetchmany(chunksize)
+        return pd.DataFrame(
+            {name: np.asarray(buf, dtype=dtypes[name]) if name in dtypes else buf
+             for name, buf in zip(names, buffers)},
+            columns=names,
+        )
 
-            if not getattr(self, "_engine", None):
-                # create engine and cache it for reuse
-                self._engine = create_engine(uri)
+    def copy_to_dataframe(self, query, params=None, autocommit=False, text_columns=()):
+        """
+        Run a SELECT through `COPY (...) TO STDOUT` as CSV and parse it with pyarrow.
+        Avoids boxing every cell into a Python object on the DBAPI path; falls
+        back to to_dataframe() if pyarrow is missing or cannot parse the output.
+        SQL errors propagate, leaving the caller's transaction to the caller.
+
+        The CSV carries no column types, so pass the text columns of the query
+        in `text_columns`: they are read as strings instead of being guessed
+        (a name like "123" or "true" would otherwise come back as int/bool).
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+        except ImportError:
+            return self.to_dataframe(query, params=params, autocommit=autocommit)
 
-            return pd.read_sql_query(query, self._engine, params=params)
-        except Exception:
-            # fallback to direct DBAPI connection
-            return pd.read_sql_query(query, self.conn, params=params)
+        self.connect()
+        with self._autocommit(autocommit), self.conn.cursor() as cur:
+            # COPY takes no bind parameters: let psycopg2 quote them in; a
+            # trailing `;` would break the `COPY (...)` wrapper
+            select_sql = re.sub(r"[\s;]+$", "", cur.mogrify(query, params).decode("utf-8"))
+            buf = io.BytesIO()
+            cur.copy_expert(f"COPY ({select_sql}) TO STDOUT WITH (FORMAT CSV, HEADER)", buf)
+        buf.seek(0)
+        # COPY CSV writes NULL as an unquoted empty field and '' as `""`;
+        # booleans come out as t/f
+        convert_options = pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in text_columns},
+            null_values=[""],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+            true_values=["t"],
+            false_values=["f"],
+        )
+        try:
+            return pa_csv.read_csv(buf, convert_options=convert_options).to_pandas()
+        except pa.ArrowInvalid:
+            # the query itself worked: re-read it over the DBAPI path
+            return self.to_dataframe(query, params=params, autocommit=autocommit)
+
+    def _engine_uri(self):
+        user_quoted = urllib.parse.quote_plus(self.user) if self.user else ""
+        pwd_quoted = urllib.parse.quote_plus(self.password) if self.password else ""
+        sslmode = getattr(self, "sslmode", None)
+        query = f"?sslmode={sslmode}" if sslmode else ""
+        return (
+            f"postgresql+psycopg2://{user_quoted}:{pwd_quoted}@{self.host or 'localhost'}:"
+            f"{int(self.port or 5432)}/{self.dbname or ''}{query}"
+        )
+
+    def to_dataframe(self, query, params=None, use_engine=False, autocommit=False):
+        """
+        Run a SELECT and return a pandas DataFrame.
+
+        By default the query runs on this instance's (pooled) DBAPI connection.
+        Pass `use_engine=True` to go through the shared SQLAlchemy engine instead
+        (ignored when SQLAlchemy is not installed). `autocommit=True` runs the
+        DBAPI read in autocommit mode, skipping the BEGIN/COMMIT round-trips.
+        """
+        self.connect()
+        if not use_engine or create_engine is None:
+            with self._autocommit(autocommit), warnings.catch_warnings():
+                # pandas warns on any non-SQLAlchemy connection; psycopg2 works fine
+                warnings.filterwarnings("ignore", message=".*SQLAlchemy connectable.*", category=UserWarning)
+                return pd.read_sql_query(query, self.conn, params=params)
+
+        if not getattr(self, "_engine", None):
+            uri = self._engine_uri()
+            # reuse the engine (and its connection pool) for this URI
+            with PostgresDB._engines_lock:
+                engine = PostgresDB._engines.get(uri)
+                if engine is None:
+                    engine = PostgresDB._engines[uri] = create_engine(
+                        uri,
+                        pool_size=5,
+                        max_overflow=10,
+                        pool_recycle=3600,   # recycle before idle server-side timeouts
+                        pool_pre_ping=True,  # drop dead pooled connections transparently
+                        pool_use_lifo=True,  # reuse the most recent (warm) connection
+                    )
+            self._engine = engine
+
+        return pd.read_sql_query(query, self._engine, params=params)
 
     def is_connected(self):
         return bool(self.conn and getattr(self.conn, "closed", 1) == 0)
@@ -201,6 +722,7 @@ def get_postgresdb_from_neon_keys(path: str = "neondb_keys.json", use_json: bool
     return db
 
 
+@functools.lru_cache(maxsize=4)
 def load_db_config(path: str = "neondb_keys.json", use_json: bool = False, env_path: str = ".env") -> Dict[str, Any]:
     """Load DB configuration.
 
@@ -208,6 +730,10 @@ def load_db_config(path: str = "neondb_keys.json", use_json: bool = False, env_p
     read `os.environ` (so .env values are respected). If `use_json=True`,
     the function will prefer the JSON file at `path` instead.
 
+    Results are memoized per (path, use_json, env_path), so the returned dict
+    is shared: treat it as read-only. Call `load_db_config.cache_clear()` after
+    changing the environment or the key files.
+
     Returns a dict with possible keys: CONNECTION_URL, PGHOST, PGPORT, PGDATABASE,
     PGUSER, PGPASSWORD, PGSSLMODE
     """
@@ -226,8 +752,7 @@ def load_db_config(path: str = "neondb_keys.json", use_json: bool = False, env_p
         p = Path(path)
         if p.exists():
             try:
-                with p.open('r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = loads_json(p.read_bytes())
                 return {k: data.get(k) for k in data}
             except Exception as e:
                 logging.warning('Failed to read %s: %s', path, e)
@@ -255,8 +780,7 @@ def load_db_config(path: str = "neondb_keys.json", use_json: bool = False, env_p
     p = Path(path)
     if p.exists():
         try:
-            with p.open('r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = loads_json(p.read_bytes())
             return {k: data.get(k) for k in data}
         except Exception as e:
             logging.warning('Failed to read %s: %s', path, e)
@@ -265,6 +789,11 @@ def load_db_config(path: str = "neondb_keys.json", use_json: bool = False, env_p
     return {}
 
 
+# pooled engines and connections are only released when the interpreter exits
+atexit.register(PostgresDB.dispose_engines)
+atexit.register(PostgresDB.close_pools)
+
+
 if __name__ == "__main__":
     # Quick runtime self-test. Does NOT print secrets; prints counts and sample ids.
     try:
@@ -7,14 +7,16 @@ Ubicación: `metrics.py` (raíz del repo)
 
 Funciones principales:
 - pace_str_to_minutes / minutes_to_pace_str
+- pace_series_to_minutes / minutes_series_to_pace_str (versiones vectorizadas)
 - pace_min_per_km_to_kph / kph_to_pace_min_per_km
-- elevation_grade
+- elevation_grade / elevation_grade_array
 - compute_ngp_speed_factor (usa trainingpeaks.ngp_speed_factor)
+- compute_ngp_speed_factor_array / compute_cost_of_running_array (por lotes)
 - get_threshold_speed (por deporte)
 - compute_speed_flat_tp
 - compute_intensity_factor
-- compute_rtss
-- compute_energy (minetti cost + kcal)
+- compute_rtss / compute_rtss_batch
+- compute_energy (minetti cost + kcal) / compute_energy_batch
 - calculate_clean_quartiles
 - compute_time_in_zones
 
@@ -26,6 +28,13 @@ from typing import List, Tuple, Optional
 import pandas as pd
 import numpy as np
 
+# Import único al cargar el módulo; las funciones que lo necesitan lanzan
+# ImportError (vía `_import_trainingpeaks_and_minetti`) si no está instalada.
+try:
+    from specialsauce.specialsauce.sources import trainingpeaks as _trainingpeaks, minetti as _minetti
+except Exception:  # pragma: no cover - dependencia opcional
+    _trainingpeaks = _minetti = None
+
 
 def pace_str_to_minutes(pace: str) -> float:
     """Convierte un string de ritmo 'M:SS' o 'MM:SS' a minutos decimales por km.
@@ -60,6 +69,38 @@ def minutes_to_pace_str(minutes: float) -> str:
     return f"{m}:{s:02d}"
 
 
+def pace_series_to_minutes(paces: pd.Series) -> pd.Series:
+    """Versión vectorizada de `pace_str_to_minutes` para una serie completa.
+
+    Acepta 'M:SS' o números (como número o string). Los valores no válidos
+    quedan como NaN en lugar de lanzar ValueError.
+    """
+    if paces.empty:
+        return pd.Series(dtype=float, index=paces.index)
+    s = paces.astype(str).str.strip()
+    parts = s.str.split(':', expand=True)
+    minutes = pd.to_numeric(parts[0], errors='coerce')
+    has_colon = s.str.contains(':', regex=False)
+    if parts.shape[1] > 1:
+        seconds = pd.to_numeric(parts[1], errors='coerce').where(has_colon, 0.0)
+    else:
+        seconds = 0.0
+    return (minutes + seconds / 60.0).astype(float)
+
+
+def minutes_series_to_pace_str(minutes: pd.Series) -> pd.Series:
+    """Versión vectorizada de `minutes_to_pace_str`: minutos/km -> 'M:SS'.
+
+    NaN (o infinito) se convierte en ''.
+    """
+    m = pd.to_numeric(minutes, errors='coerce').to_numpy(dtype=float)
+    valid = np.isfinite(m)
+    total = np.rint(np.where(valid, m, 0.0) * 60).astype('int64')
+    mins, secs = np.divmod(total, 60)
+    out = pd.Series(mins.astype(str), index=minutes.index) + ':' + pd.Series(secs.astype(str), index=minutes.index).str.zfill(2)
+    return out.where(valid, '')
+
+
 def pace_min_per_km_to_kph(pace_min_per_km: float) -> float:
     """Convierte minutos por km a km/h.
 
@@ -93,12 +134,24 @@ def elevation_grade(elevation_gain_m: float, elevation_loss_m: float, distance_m
         return 0.0
 
 
+def elevation_grade_array(elevation_gain_m, elevation_loss_m, distance_m) -> np.ndarray:
+    """Versión vectorizada de `elevation_grade` (una actividad por posición).
+
+    Igual que la versión escalar: distancia 0 devuelve 0.0 y un NaN en
+    cualquier entrada (gain, loss o distance) se propaga como NaN.
+    """
+    gain = np.asarray(elevation_gain_m, dtype='float64')
+    loss = np.asarray(elevation_loss_m, dtype='float64')
+    dist = np.asarray(distance_m, dtype='float64')
+    out = np.zeros(np.broadcast(gain, loss, dist).shape, dtype='float64')
+    np.divide(gain - loss, dist, out=out, where=dist != 0)
+    return out
+
+
 def _import_trainingpeaks_and_minetti():
-    try:
-        from specialsauce.specialsauce.sources import trainingpeaks, minetti
-        return trainingpeaks, minetti
-    except Exception as e:
-        raise ImportError("La librería 'specialsauce' no está disponible. Instala 'specialsauce' para usar estas funciones.") from e
+    if _trainingpeaks is None or _minetti is None:
+        raise ImportError("La librería 'specialsauce' no está disponible. Instala 'specialsauce' para usar estas funciones.")
+    return _trainingpeaks, _minetti
 
 
 def compute_ngp_speed_factor(elevation_grade_value: float) -> float:
@@ -110,6 +163,37 @@ def compute_ngp_speed_factor(elevation_grade_value: float) -> float:
     return trainingpeaks.ngp_speed_factor(elevation_grade_value)
 
 
+def compute_ngp_speed_factor_array(grades: np.ndarray) -> np.ndarray:
+    """Versión por lotes de `compute_ngp_speed_factor` sobre un array de pendientes.
+
+    Lanza ImportError si specialsauce no está instalada.
+    """
+    trainingpeaks, _ = _import_trainingpeaks_and_minetti()
+    return np.vectorize(trainingpeaks.ngp_speed_factor, otypes=[np.float64])(np.asarray(grades, dtype='float64'))
+
+
+def compute_cost_of_running_array(grades: np.ndarray) -> np.ndarray:
+    """minetti.cost_of_running aplicado a un array de pendientes (J/kg/m).
+
+    Lanza ImportError si specialsauce no está instalada.
+    """
+    _, minetti = _import_trainingpeaks_and_minetti()
+    return np.vectorize(minetti.cost_of_running, otypes=[np.float64])(np.asarray(grades, dtype='float64'))
+
+
+# Umbrales por deporte (constantes, calculados una vez al importar)
+_RUN_THRESHOLD = pace_min_per_km_to_kph(3.75)  # 3.75 min/km
+_SWIM_THRESHOLD = pace_min_per_km_to_kph(2.0 * 10.0)  # 2 min/100m -> 20 min/km -> 3.0 km/h
+_THRESHOLDS = {
+    'running': _RUN_THRESHOLD,
+    'run': _RUN_THRESHOLD,
+    'cycling': 200.0,
+    'bike': 200.0,
+    'swimming': _SWIM_THRESHOLD,
+    'swim': _SWIM_THRESHOLD,
+}
+
+
 def get_threshold_speed(sport: str) -> float:
     """Devuelve el umbral (en unidades apropiadas) para el deporte.
 
@@ -117,19 +201,8 @@ def get_threshold_speed(sport: str) -> float:
     - cycling: 200 (watts)
     - swimming: 2 min/100m -> convertido a km/h
     """
-    s = sport.lower()
-    if s == 'running' or s == 'run':
-        pace = 3.75  # min/km
-        return pace_min_per_km_to_kph(pace)
-    if s == 'cycling' or s == 'bike':
-        return 200.0
-    if s == 'swimming' or s == 'swim':
-        # 2 min per 100m -> 20 min per km -> kph = 60/20 = 3.0
-        pace_100m_min = 2.0
-        pace_per_km = pace_100m_min * 10.0
-        return pace_min_per_km_to_kph(pace_per_km)
     # default: assume running-like
-    return pace_min_per_km_to_kph(3.75)
+    return _THRESHOLDS.get(sport.lower(), _RUN_THRESHOLD)
 
 
 def compute_speed_flat_tp(average_speed_tp: float, elevation_grade_value: float) -> float:
@@ -153,26 +226,51 @@ def compute_intensity_factor(speed_flat_tp: float, threshold_speed: float) -> fl
     return float(speed_flat_tp) / float(threshold_speed)
 
 
+def _first_row_value(df_summary, column: str) -> Optional[float]:
+    """Primer valor de `column` por posición (`.iat`), o el propio escalar.
+
+    Acepta un número en lugar del DataFrame para que el llamador pueda pasar
+    el valor ya extraído. Devuelve None si la columna no existe o está vacía.
+    """
+    if isinstance(df_summary, (int, float, np.number)):
+        return float(df_summary)
+    try:
+        return float(df_summary.iat[0, df_summary.columns.get_loc(column)])
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
 def compute_rtss(df_summary: pd.DataFrame, speed_flat_tp: float, intensity_factor: float, threshold_speed: float) -> Optional[float]:
     """Calcula RTSS según la fórmula provista:
 
     rtss = (df_summary.durationInSeconds[0] * speed_flat_tp * intensity_factor) / (threshold_speed * 3600) * 100
 
-    Asume que `df_summary` es un DataFrame y que la fila 0 contiene `durationInSeconds`.
+    Asume que `df_summary` es un DataFrame cuya primera fila contiene `durationInSeconds`
+    (o directamente la duración en segundos como número).
     """
-    try:
-        duration = float(df_summary.loc[0, 'durationInSeconds'])
-    except Exception:
-        try:
-            duration = float(df_summary['durationInSeconds'].iat[0])
-        except Exception:
-            return None
+    duration = _first_row_value(df_summary, 'durationInSeconds')
+    if duration is None:
+        return None
     if threshold_speed == 0:
         return None
     rtss = (duration * speed_flat_tp * intensity_factor) / (threshold_speed * 3600.0) * 100.0
     return float(rtss)
 
 
+def compute_rtss_batch(durations, speed_flat_tp, intensity_factor, threshold_speed) -> np.ndarray:
+    """RTSS para muchas actividades a la vez (arrays o escalares que hagan broadcast).
+
+    Devuelve NaN donde `threshold_speed` es 0 (la versión escalar devuelve None).
+    """
+    duration = np.asarray(durations, dtype='float64')
+    speed = np.asarray(speed_flat_tp, dtype='float64')
+    intensity = np.asarray(intensity_factor, dtype='float64')
+    threshold = np.asarray(threshold_speed, dtype='float64')
+    out = np.full(np.broadcast(duration, speed, intensity, threshold).shape, np.nan)
+    np.divide(duration * speed * intensity * 100.0, threshold * 3600.0, out=out, where=threshold != 0)
+    return out
+
+
 def compute_energy(df_summary: pd.DataFrame, elevation_grade_value: float, weight_kg: float = 73.0) -> Tuple[Optional[float], Optional[float]]:
     """Calcula kj_kg y kcal estimadas usando minetti.cost_of_running.
 
@@ -180,37 +278,70 @@ def compute_energy(df_summary: pd.DataFrame, elevation_grade_value: float, weigh
     kj_kg = cost_of_running_minetti * distance_m / 1000
     kcal = (kj_kg * weight) / 4.184
 
-    Aquí `df_summary.distanceInMeters[0]` se usa como distancia.
+    Aquí la primera fila de `df_summary.distanceInMeters` se usa como distancia
+    (también acepta la distancia en metros como número).
     """
     _, minetti = _import_trainingpeaks_and_minetti()
-    try:
-        distance_m = float(df_summary.loc[0, 'distanceInMeters'])
-    except Exception:
-        try:
-            distance_m = float(df_summary['distanceInMeters'].iat[0])
-        except Exception:
-            return None, None
+    distance_m = _first_row_value(df_summary, 'distanceInMeters')
+    if distance_m is None:
+        return None, None
     cost = minetti.cost_of_running(elevation_grade_value)
     kj_kg = cost * distance_m / 1000.0
     kcal = (kj_kg * float(weight_kg)) / 4.184
     return float(kj_kg), float(kcal)
 
 
+def compute_energy_batch(distances_m, elevation_grades, weight_kg: float = 73.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Versión por lotes de `compute_energy`: devuelve arrays (kj_kg, kcal)."""
+    cost = compute_cost_of_running_array(elevation_grades)
+    kj_kg = cost * np.asarray(distances_m, dtype='float64') / 1000.0
+    kcal = (kj_kg * float(weight_kg)) / 4.184
+    return kj_kg, kcal
+
+
 def calculate_clean_quartiles(series: pd.Series):
     """Filtra ceros/negativos y devuelve (q1, median, q3, q4).
 
     Devuelve None si la serie limpia queda vacía.
     """
-    clean_series = series[series > 0]
-    if clean_series.empty:
+    arr = series.to_numpy(dtype='float64', na_value=np.nan)
+    arr = arr[arr > 0]
+    if arr.size == 0:
         return None
-    q1 = clean_series.quantile(0.25)
-    median = clean_series.quantile(0.50)
-    q3 = clean_series.quantile(0.75)
-    q4 = clean_series.quantile(1.00)
+    # una sola ordenación para los cuatro cuantiles
+    q1, median, q3, q4 = np.quantile(arr, [0.25, 0.50, 0.75, 1.00])
     return q1, median, q3, q4
 
 
+def _contiguous_zone_counts(arr: np.ndarray, zones: List[Tuple[Optional[float], Optional[float]]]) -> Optional[np.ndarray]:
+    """Cuenta muestras por zona con un solo `np.searchsorted` + `np.bincount`.
+
+    Solo aplica si las zonas son contiguas y crecientes (hi de una == lo de la
+    siguiente; None únicamente como lo de la primera / hi de la última).
+    Devuelve None si no lo son.
+    """
+    if not zones:
+        return None
+    los = [lo for lo, _ in zones]
+    his = [hi for _, hi in zones]
+    if any(lo is None for lo in los[1:]) or any(hi is None for hi in his[:-1]):
+        return None
+    if any(his[i] != los[i + 1] for i in range(len(zones) - 1)):
+        return None
+    edges = np.array(
+        [-np.inf if los[0] is None else los[0]] + his[:-1] + [np.inf if his[-1] is None else his[-1]],
+        dtype='float64',
+    )
+    if np.any(np.diff(edges) <= 0):
+        return None
+    idx = np.searchsorted(edges, arr, side='right') - 1
+    if his[-1] is None:
+        # zona abierta por arriba: incluye también +inf
+        idx[idx == len(zones)] = len(zones) - 1
+    idx = idx[(idx >= 0) & (idx < len(zones))]
+    return np.bincount(idx, minlength=len(zones))
+
+
 def compute_time_in_zones(values: pd.Series, zones: List[Tuple[Optional[float], Optional[float]]], total_time_seconds: Optional[float] = None):
     """Calcula % de muestras y minutos en cada zona.
 
@@ -225,18 +356,25 @@ def compute_time_in_zones(values: pd.Series, zones: List[Tuple[Optional[float],
     if clean.empty:
         return []
     n = len(clean)
+
+    arr = clean.to_numpy(dtype='float64')
+    counts = _contiguous_zone_counts(arr, zones)
+    if counts is None:
+        # zonas solapadas o con huecos: una comparación por zona
+        counts = []
+        for lo, hi in zones:
+            if lo is None and hi is None:
+                counts.append(n)
+            elif lo is None:
+                counts.append(np.count_nonzero(arr < hi))
+            elif hi is None:
+                counts.append(np.count_nonzero(arr >= lo))
+            else:
+                counts.append(np.count_nonzero((arr >= lo) & (arr < hi)))
+
     results = []
-    for z in zones:
-        lo, hi = z
-        if lo is None and hi is None:
-            mask = pd.Series([True] * n)
-        elif lo is None:
-            mask = clean < hi
-        elif hi is None:
-            mask = clean >= lo
-        else:
-            mask = (clean >= lo) & (clean < hi)
-        count = int(mask.sum())
+    for z, count in zip(zones, counts):
+        count = int(count)
         pct = float(count) / float(n)
         if total_time_seconds is not None:
             minutes = pct * float(total_time_seconds) / 60.0